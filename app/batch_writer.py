@@ -0,0 +1,171 @@
+"""
+Background writer that coalesces forecast persistence into bulk inserts
+"""
+import asyncio
+import logging
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.config import settings
+from app.models import PredictionPoint
+from app import crud, database
+
+logger = logging.getLogger(__name__)
+
+BatchItem = Tuple[Dict[str, Any], List[Dict[str, Any]]]
+
+_queue: Optional[asyncio.Queue] = None
+_flusher_task: Optional[asyncio.Task] = None
+_STOP = object()
+
+
+def start():
+    """Start the background flusher (call from the running event loop)"""
+    global _queue, _flusher_task
+    
+    if _flusher_task is not None:
+        return
+    
+    # Bounded so a slow database can't grow memory without limit; see enqueue
+    _queue = asyncio.Queue(maxsize=settings.db_write_queue_size)
+    _flusher_task = asyncio.create_task(_flusher())
+    logger.info("Prediction batch writer started")
+
+
+async def stop():
+    """Flush anything still queued and stop the background flusher"""
+    global _queue, _flusher_task
+    
+    if _flusher_task is None:
+        return
+    
+    # Wait for room rather than dropping the sentinel when the queue is full
+    await _queue.put(_STOP)
+    await _flusher_task
+    _queue = None
+    _flusher_task = None
+    logger.info("Prediction batch writer stopped")
+
+
+def is_running() -> bool:
+    """Check if the background flusher is accepting work"""
+    return _flusher_task is not None
+
+
+def enqueue(
+    request_id: str,
+    species: str,
+    province: str,
+    city: str,
+    date_from: date,
+    date_to: date,
+    predictions: List[PredictionPoint],
+    ip_address: Optional[str] = None,
+    user_agent: Optional[str] = None
+) -> bool:
+    """
+    Queue a forecast request and its predictions for the next bulk write
+    
+    Never blocks the response path: when the queue is full the forecast is not
+    saved and False is returned, so the caller doesn't hand out its request_id.
+    
+    Args:
+        request_id: Pre-generated UUID of the prediction request
+        species: Fish species
+        province: Province name
+        city: City name
+        date_from: Start date
+        date_to: End date
+        predictions: List of prediction points
+        ip_address: Client IP address (optional)
+        user_agent: Client user agent (optional)
+    
+    Returns:
+        True if the forecast was queued, False if the queue was full
+    """
+    request_row = {
+        "request_id": request_id,
+        "species": species,
+        "province": province,
+        "city": city,
+        "date_from": date_from,
+        "date_to": date_to,
+        "ip_address": ip_address,
+        "user_agent": user_agent
+    }
+    prediction_rows = [
+        {
+            "prediction_date": date.fromisoformat(pred.date),
+            "predicted_harvest": pred.predicted_harvest,
+            "confidence_lower": pred.confidence_lower,
+            "confidence_upper": pred.confidence_upper
+        }
+        for pred in predictions
+    ]
+    try:
+        _queue.put_nowait((request_row, prediction_rows))
+    except asyncio.QueueFull:
+        logger.warning(f"Forecast write queue full ({_queue.maxsize}); request {request_id} will not be saved")
+        return False
+    return True
+
+
+async def _flusher():
+    """Drain the queue, writing up to db_flush_batch_size requests per transaction"""
+    loop = asyncio.get_running_loop()
+    
+    while True:
+        item = await _queue.get()
+        if item is _STOP:
+            return
+        
+        batch: List[BatchItem] = [item]
+        stopping = False
+        deadline = loop.time() + settings.db_flush_interval
+        
+        while len(batch) < settings.db_flush_batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(_queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            if item is _STOP:
+                stopping = True
+                break
+            batch.append(item)
+        
+        await _write(batch)
+        
+        if stopping:
+            return
+
+
+async def _write(batch: List[BatchItem]):
+    """
+    Persist one coalesced batch, logging instead of raising on failure
+    
+    If the bulk transaction fails, every request is retried in its own
+    transaction so one bad row only loses its own forecast.
+    """
+    try:
+        async with database.SessionLocal() as db:
+            count = await crud.save_prediction_batch(db, batch)
+        logger.info(f"Harvest forecasts saved to database: {len(batch)} requests, {count} predictions")
+        return
+    except Exception as db_error:
+        if len(batch) == 1:
+            logger.error(f"Failed to save forecast request {batch[0][0]['request_id']} to database: {db_error}")
+            return
+        logger.warning(f"Bulk save of {len(batch)} forecast requests failed, saving one by one: {db_error}")
+    
+    saved = 0
+    for request_row, prediction_rows in batch:
+        try:
+            async with database.SessionLocal() as db:
+                await crud.save_prediction(db, request_row, prediction_rows)
+            saved += 1
+        except Exception as db_error:
+            logger.error(f"Failed to save forecast request {request_row['request_id']} to database: {db_error}")
+    logger.info(f"Harvest forecasts saved to database one by one: {saved} of {len(batch)} requests")
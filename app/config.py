@@ -2,6 +2,7 @@
 Configuration management for the ML Service
 """
 import os
+from functools import cached_property, lru_cache
 from typing import List, Optional
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -17,7 +18,7 @@ class Settings(BaseSettings):
     
     # Server Configuration
     host: str = "0.0.0.0"
-    port: int = int(os.getenv("PORT", "8000"))
+    port: int = Field(default_factory=lambda: int(os.getenv("PORT", "8000")))
     
     # Environment
     environment: str = os.getenv("ENVIRONMENT", "development")
@@ -25,9 +26,15 @@ class Settings(BaseSettings):
     
     # CORS Configuration
     allowed_origins: str = Field(
-        default="http://localhost:3000,http://localhost:3001,https://*.railway.app,https://*.vercel.app",
+        default="http://localhost:3000,http://localhost:3001",
         json_schema_extra={"env": "ALLOWED_ORIGINS"}
     )
+    # Wildcard subdomains (e.g. *.railway.app) can't be listed as exact origins,
+    # so they are matched by a single regex compiled once by CORSMiddleware
+    allowed_origin_regex: Optional[str] = Field(
+        default=r"^https://([a-z0-9-]+\.)?(railway|vercel)\.app$",
+        json_schema_extra={"env": "ALLOWED_ORIGIN_REGEX"}
+    )
     
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -35,12 +42,17 @@ class Settings(BaseSettings):
         extra="ignore"
     )
     
-    @property
+    @cached_property
     def cors_origins(self) -> List[str]:
-        """Parse CORS origins from comma-separated string"""
-        if not self.allowed_origins or self.allowed_origins.strip() == "":
-            return ["*"]
-        return [origin.strip() for origin in self.allowed_origins.split(",") if origin.strip()]
+        """
+        Parse exact CORS origins from comma-separated string (computed once)
+        
+        Entries with a wildcard inside the host (e.g. https://*.railway.app) are
+        skipped; CORSMiddleware compares origins literally, so they never match.
+        Use allowed_origin_regex for those instead.
+        """
+        origins = [origin.strip() for origin in self.allowed_origins.split(",") if origin.strip()]
+        return [origin for origin in origins if origin == "*" or "*" not in origin]
     
     # Model Configuration
     models_dir: str = "app/models"
@@ -50,11 +62,24 @@ class Settings(BaseSettings):
     # Prediction Configuration
     max_forecast_days: int = 365
     default_forecast_days: int = 30
+    max_batch_requests: int = 50  # Max forecast requests per /predict/batch call
     
     # Database Configuration
-    database_url: str = os.getenv("DATABASE_URL", "")
+    database_url: str = Field(default_factory=lambda: os.getenv("DATABASE_URL", ""))
     database_echo: bool = debug  # Log SQL queries in debug mode
+    db_pool_size: int = 20  # Persistent pooled connections (DB_POOL_SIZE)
+    db_max_overflow: int = 10  # Extra connections under burst load (DB_MAX_OVERFLOW)
+    db_pool_timeout: int = 30  # Seconds to wait for a pooled connection
+    db_flush_batch_size: int = 200  # Max forecast requests coalesced per write
+    db_flush_interval: float = 0.1  # Seconds to wait for more requests before writing
+    db_write_queue_size: int = 5000  # Max forecast requests waiting to be written
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Return the process-wide Settings instance"""
+    return Settings()
 
 
 # Global settings instance
-settings = Settings()
+settings = get_settings()
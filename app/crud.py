@@ -1,103 +1,180 @@
 """
 CRUD operations for database
 """
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
-from typing import List, Optional
-from datetime import date, datetime
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, or_, insert, select, func
+from typing import Any, Dict, List, Optional, Tuple
+from datetime import date
 import uuid
 
 from app.db_models import PredictionRequest, Prediction
-from app.models import PredictionPoint
 
 
-def create_prediction_request(
-    db: Session,
+async def create_prediction_request(
+    db: AsyncSession,
     species: str,
     province: str,
     city: str,
-    date_from: str,
-    date_to: str,
+    date_from: date,
+    date_to: date,
     ip_address: Optional[str] = None,
-    user_agent: Optional[str] = None
-) -> PredictionRequest:
+    user_agent: Optional[str] = None,
+    request_id: Optional[str] = None
+) -> Tuple[int, str]:
     """
     Create a new prediction request record
     
+    Does not commit; the caller owns the transaction (see save_prediction).
+    
     Args:
         db: Database session
         species: Fish species
         province: Province name
         city: City name
-        date_from: Start date (YYYY-MM-DD)
-        date_to: End date (YYYY-MM-DD)
+        date_from: Start date
+        date_to: End date
         ip_address: Client IP address (optional)
         user_agent: Client user agent (optional)
+        request_id: Pre-generated UUID (optional, generated if omitted)
     
     Returns:
-        Created PredictionRequest object
-    """
-    request_id = str(uuid.uuid4())
-    
-    db_request = PredictionRequest(
-        request_id=request_id,
-        species=species,
-        province=province,
-        city=city,
-        date_from=datetime.strptime(date_from, "%Y-%m-%d").date(),
-        date_to=datetime.strptime(date_to, "%Y-%m-%d").date(),
-        ip_address=ip_address,
-        user_agent=user_agent
-    )
+        Tuple of (primary key, UUID) of the created prediction request
+    """
+    request_id = uuid.UUID(request_id) if request_id else uuid.uuid4()
     
-    db.add(db_request)
-    db.commit()
-    db.refresh(db_request)
+    result = await db.execute(
+        insert(PredictionRequest).values(
+            request_id=request_id,
+            species=species,
+            province=province,
+            city=city,
+            date_from=date_from,
+            date_to=date_to,
+            ip_address=ip_address,
+            user_agent=user_agent
+        )
+    )
     
-    return db_request
+    return result.inserted_primary_key[0], str(request_id)
 
 
-def create_predictions(
-    db: Session,
-    request_id: str,
-    predictions: List[PredictionPoint]
-) -> List[Prediction]:
+async def create_predictions(
+    db: AsyncSession,
+    request_pk: int,
+    prediction_rows: List[Dict[str, Any]]
+) -> int:
     """
     Create prediction records for a request
     
+    Does not commit; the caller owns the transaction (see save_prediction).
+    
     Args:
         db: Database session
-        request_id: UUID of the prediction request
-        predictions: List of prediction points
+        request_pk: Primary key of the parent prediction request
+        prediction_rows: Prediction column values without request_id
     
     Returns:
-        List of created Prediction objects
+        Number of prediction rows inserted
+    """
+    return await _insert_prediction_rows(
+        db, [{**prediction_row, "request_id": request_pk} for prediction_row in prediction_rows]
+    )
+
+
+async def _insert_prediction_rows(db: AsyncSession, rows: List[Dict[str, Any]]) -> int:
     """
-    db_predictions = []
+    Insert fully keyed prediction rows
     
-    for pred in predictions:
-        db_pred = Prediction(
-            request_id=request_id,
-            prediction_date=datetime.strptime(pred.date, "%Y-%m-%d").date(),
-            predicted_harvest=pred.predicted_harvest,
-            confidence_lower=pred.confidence_lower,
-            confidence_upper=pred.confidence_upper
-        )
-        db_predictions.append(db_pred)
+    Rows are written with a single Core ``insert()`` executemany so the
+    driver can batch them into multi-row VALUES statements instead of
+    flushing one ORM object per prediction. Does not commit.
+    """
+    if rows:
+        await db.execute(insert(Prediction), rows)
+    
+    return len(rows)
+
+
+async def save_prediction(
+    db: AsyncSession,
+    request_row: Dict[str, Any],
+    prediction_rows: List[Dict[str, Any]]
+) -> str:
+    """
+    Save a prediction request and its predictions in a single transaction
+    
+    Used by the batch writer to retry requests one by one when a bulk write fails.
+    
+    Args:
+        db: Database session
+        request_row: PredictionRequest column values (keyword arguments of
+            create_prediction_request), including a pre-generated request_id
+        prediction_rows: Prediction column values without request_id
+    
+    Returns:
+        UUID of the saved prediction request
+    """
+    async with db.begin():
+        request_pk, request_id = await create_prediction_request(db, **request_row)
+        await create_predictions(db=db, request_pk=request_pk, prediction_rows=prediction_rows)
     
-    db.add_all(db_predictions)
-    db.commit()
+    return request_id
+
+
+async def save_prediction_batch(
+    db: AsyncSession,
+    batch: List[Tuple[Dict[str, Any], List[Dict[str, Any]]]]
+) -> int:
+    """
+    Save many prediction requests and their predictions in one transaction
+    
+    Parent rows go out in one executemany and children in another, so a batch
+    costs a fixed number of statements instead of two per request. The parent
+    primary keys are read back with a single SELECT on the UUIDs, since MySQL
+    can't return them from a multi-row INSERT.
+    
+    Args:
+        db: Database session
+        batch: List of (request_row, prediction_rows) tuples, in the shape
+            save_prediction takes
+    
+    Returns:
+        Number of prediction rows inserted
+    """
+    request_rows = [request_row for request_row, _ in batch]
     
-    return db_predictions
+    async with db.begin():
+        await db.execute(insert(PredictionRequest), request_rows)
+        
+        result = await db.execute(
+            select(PredictionRequest.request_id, PredictionRequest.id)
+            .where(PredictionRequest.request_id.in_([row["request_id"] for row in request_rows]))
+        )
+        pk_by_request_id = dict(result.all())
+        
+        count = await _insert_prediction_rows(db, [
+            {**prediction_row, "request_id": pk_by_request_id[request_row["request_id"]]}
+            for request_row, prediction_rows in batch
+            for prediction_row in prediction_rows
+        ])
+    
+    return count
 
 
-def get_prediction_request(db: Session, request_id: str) -> Optional[PredictionRequest]:
+async def get_prediction_request(db: AsyncSession, request_id: str) -> Optional[PredictionRequest]:
     """Get a prediction request by ID"""
-    return db.query(PredictionRequest).filter(PredictionRequest.request_id == request_id).first()
+    try:
+        uuid.UUID(request_id)
+    except ValueError:
+        # Malformed IDs can't match any stored BINARY(16) UUID
+        return None
+    
+    result = await db.execute(select(PredictionRequest).filter(PredictionRequest.request_id == request_id))
+    return result.scalars().first()
 
 
-def get_prediction_requests(
-    db: Session,
+async def get_prediction_requests(
+    db: AsyncSession,
     species: Optional[str] = None,
     province: Optional[str] = None,
     city: Optional[str] = None,
@@ -105,10 +182,13 @@ def get_prediction_requests(
     date_to: Optional[date] = None,
     skip: int = 0,
     limit: int = 100
-) -> List[PredictionRequest]:
+) -> List[Tuple[PredictionRequest, int]]:
     """
     Get prediction requests with optional filters
     
+    The number of predictions per request is computed by a correlated
+    subquery in the same SELECT, so callers don't lazy-load children.
+    
     Args:
         db: Database session
         species: Filter by species
@@ -120,9 +200,16 @@ def get_prediction_requests(
         limit: Maximum number of records to return
     
     Returns:
-        List of PredictionRequest objects
+        List of (PredictionRequest, prediction_count) tuples
     """
-    query = db.query(PredictionRequest)
+    prediction_count = (
+        select(func.count(Prediction.id))
+        .where(Prediction.request_id == PredictionRequest.id)
+        .correlate(PredictionRequest)
+        .scalar_subquery()
+        .label("prediction_count")
+    )
+    query = select(PredictionRequest, prediction_count)
     
     if species:
         query = query.filter(PredictionRequest.species == species)
@@ -135,16 +222,50 @@ def get_prediction_requests(
     if date_to:
         query = query.filter(PredictionRequest.date_to <= date_to)
     
-    return query.order_by(PredictionRequest.created_at.desc()).offset(skip).limit(limit).all()
+    result = await db.execute(query.order_by(PredictionRequest.created_at.desc()).offset(skip).limit(limit))
+    return [tuple(row) for row in result.all()]
 
 
-def get_predictions_by_request(db: Session, request_id: str) -> List[Prediction]:
-    """Get all predictions for a specific request"""
-    return db.query(Prediction).filter(Prediction.request_id == request_id).order_by(Prediction.prediction_date).all()
+async def get_predictions_by_request(db: AsyncSession, request_pk: int) -> List[Dict[str, Any]]:
+    """
+    Get all predictions for a specific request by its primary key
+    
+    Selects plain column tuples (streamed in batches of 500) rather than ORM
+    objects, converting DECIMAL columns to float as each row is read.
+    
+    Args:
+        db: Database session
+        request_pk: Primary key of the prediction request
+    
+    Returns:
+        List of prediction dicts ordered by date
+    """
+    stmt = (
+        select(
+            Prediction.prediction_date,
+            Prediction.predicted_harvest,
+            Prediction.confidence_lower,
+            Prediction.confidence_upper
+        )
+        .where(Prediction.request_id == request_pk)
+        .order_by(Prediction.prediction_date)
+    )
+    
+    result = await db.stream(stmt.execution_options(yield_per=500))
+    
+    return [
+        {
+            "date": prediction_date,
+            "predicted_harvest": float(predicted_harvest),
+            "confidence_lower": float(confidence_lower) if confidence_lower is not None else None,
+            "confidence_upper": float(confidence_upper) if confidence_upper is not None else None
+        }
+        async for prediction_date, predicted_harvest, confidence_lower, confidence_upper in result
+    ]
 
 
-def get_predictions(
-    db: Session,
+async def get_predictions(
+    db: AsyncSession,
     species: Optional[str] = None,
     province: Optional[str] = None,
     city: Optional[str] = None,
@@ -169,7 +290,7 @@ def get_predictions(
     Returns:
         List of Prediction objects
     """
-    query = db.query(Prediction).join(PredictionRequest)
+    query = select(Prediction).join(PredictionRequest)
     
     if species:
         query = query.filter(PredictionRequest.species == species)
@@ -182,10 +303,11 @@ def get_predictions(
     if date_to:
         query = query.filter(Prediction.prediction_date <= date_to)
     
-    return query.order_by(Prediction.prediction_date.desc()).offset(skip).limit(limit).all()
+    result = await db.execute(query.order_by(Prediction.prediction_date.desc()).offset(skip).limit(limit))
+    return list(result.scalars().all())
 
 
-def delete_prediction_request(db: Session, request_id: str) -> bool:
+async def delete_prediction_request(db: AsyncSession, request_id: str) -> bool:
     """
     Delete a prediction request and all its predictions
     
@@ -196,22 +318,22 @@ def delete_prediction_request(db: Session, request_id: str) -> bool:
     Returns:
         True if deleted, False if not found
     """
-    db_request = get_prediction_request(db, request_id)
+    db_request = await get_prediction_request(db, request_id)
     if db_request:
-        db.delete(db_request)
-        db.commit()
+        await db.delete(db_request)
+        await db.commit()
         return True
     return False
 
 
-def get_request_count(
-    db: Session,
+async def get_request_count(
+    db: AsyncSession,
     species: Optional[str] = None,
     province: Optional[str] = None,
     city: Optional[str] = None
 ) -> int:
     """Get count of prediction requests with optional filters"""
-    query = db.query(PredictionRequest)
+    query = select(func.count(PredictionRequest.id))
     
     if species:
         query = query.filter(PredictionRequest.species == species)
@@ -220,4 +342,4 @@ def get_request_count(
     if city:
         query = query.filter(PredictionRequest.city == city)
     
-    return query.count()
+    return await db.scalar(query)
@@ -1,10 +1,10 @@
 """
 Database connection and session management
 """
-from sqlalchemy import create_engine, text
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, Session
-from typing import Generator
+from typing import AsyncGenerator
 import logging
 
 from app.config import settings
@@ -17,7 +17,21 @@ SessionLocal = None
 Base = declarative_base()
 
 
-def init_db():
+def async_database_url(database_url: str) -> str:
+    """
+    Convert Railway's mysql:// URL to the async asyncmy driver
+    
+    mysql+pymysql:// URLs from older configurations are rewritten too; PyMySQL
+    itself is no longer a dependency.
+    """
+    for sync_prefix in ("mysql://", "mysql+pymysql://"):
+        if database_url.startswith(sync_prefix):
+            logger.info("Converted DATABASE_URL to use asyncmy driver")
+            return database_url.replace(sync_prefix, "mysql+asyncmy://", 1)
+    return database_url
+
+
+async def init_db():
     """Initialize database connection"""
     global engine, SessionLocal
     
@@ -26,26 +40,28 @@ def init_db():
         return False
     
     try:
-        # Convert Railway's mysql:// to mysql+pymysql:// for SQLAlchemy
-        database_url = settings.database_url
-        if database_url.startswith("mysql://"):
-            database_url = database_url.replace("mysql://", "mysql+pymysql://", 1)
-            logger.info("Converted DATABASE_URL to use PyMySQL driver")
+        database_url = async_database_url(settings.database_url)
         
         # Create engine with MySQL-specific settings
-        engine = create_engine(
+        engine = create_async_engine(
             database_url,
             echo=settings.database_echo,
+            echo_pool=settings.debug,
+            future=True,
+            pool_size=settings.db_pool_size,        # Persistent connections kept open
+            max_overflow=settings.db_max_overflow,  # Extra connections under burst load
+            pool_timeout=settings.db_pool_timeout,
             pool_pre_ping=True,  # Verify connections before using
             pool_recycle=3600,   # Recycle connections after 1 hour
+            insertmanyvalues_page_size=1000,  # Rows per multi-VALUES INSERT batch
         )
         
         # Create session factory
-        SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        SessionLocal = async_sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
         
         # Test connection
-        with engine.connect() as conn:
-            conn.execute(text("SELECT 1"))
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
         
         logger.info("✓ Database connection established successfully")
         return True
@@ -55,13 +71,13 @@ def init_db():
         return False
 
 
-def get_db() -> Generator[Session | None, None, None]:
+async def get_db() -> AsyncGenerator[AsyncSession | None, None]:
     """
     Dependency function to get database session
     
     Usage in FastAPI endpoints:
         @app.get("/endpoint")
-        def endpoint(db: Session = Depends(get_db)):
+        async def endpoint(db: AsyncSession = Depends(get_db)):
             # Use db here
     
     Returns None if database is not initialized.
@@ -71,21 +87,19 @@ def get_db() -> Generator[Session | None, None, None]:
         yield None
         return
     
-    db = SessionLocal()
-    try:
+    async with SessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 
-def create_tables():
+async def create_tables():
     """Create all tables in the database"""
     if engine is None:
         logger.warning("Cannot create tables: database not initialized")
         return False
     
     try:
-        Base.metadata.create_all(bind=engine)
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
         logger.info("✓ Database tables created successfully")
         return True
     except Exception as e:
@@ -1,22 +1,46 @@
 """
 SQLAlchemy ORM models for database tables
 """
-from sqlalchemy import Column, Integer, String, Date, DECIMAL, TIMESTAMP, Text, ForeignKey
+from sqlalchemy import Column, Integer, String, Date, DECIMAL, TIMESTAMP, Text, ForeignKey, Index, BINARY
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
+from sqlalchemy.types import TypeDecorator
+import uuid
 
 from app.database import Base
 
 
+class BinaryUUID(TypeDecorator):
+    """UUID stored as BINARY(16), exposed to Python as the canonical hyphenated string"""
+    impl = BINARY(16)
+    cache_ok = True
+    
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        if not isinstance(value, uuid.UUID):
+            value = uuid.UUID(value)
+        return value.bytes
+    
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return str(uuid.UUID(bytes=value))
+
+
 class PredictionRequest(Base):
     """Model for prediction requests"""
     __tablename__ = "prediction_requests"
+    __table_args__ = (
+        # Covers the species/province/city filters and the created_at DESC sort
+        Index("ix_pr_filter", "species", "province", "city", "created_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
-    request_id = Column(String(36), unique=True, index=True, nullable=False)
+    request_id = Column(BinaryUUID, unique=True, index=True, nullable=False)
     species = Column(String(50), nullable=False, index=True)
-    province = Column(String(100), nullable=False, index=True)
-    city = Column(String(100), nullable=False, index=True)
+    province = Column(String(100), nullable=False)
+    city = Column(String(100), nullable=False)
     date_from = Column(Date, nullable=False)
     date_to = Column(Date, nullable=False)
     created_at = Column(TIMESTAMP, server_default=func.now(), nullable=False)
@@ -33,9 +57,13 @@ class PredictionRequest(Base):
 class Prediction(Base):
     """Model for individual predictions"""
     __tablename__ = "predictions"
+    __table_args__ = (
+        # Serves per-request lookups ordered by prediction_date
+        Index("ix_pred_req_date", "request_id", "prediction_date"),
+    )
     
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
-    request_id = Column(String(36), ForeignKey("prediction_requests.request_id"), nullable=False, index=True)
+    request_id = Column(Integer, ForeignKey("prediction_requests.id"), nullable=False)
     prediction_date = Column(Date, nullable=False, index=True)
     predicted_harvest = Column(DECIMAL(10, 2), nullable=False)
     confidence_lower = Column(DECIMAL(10, 2), nullable=True)
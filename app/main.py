@@ -2,13 +2,18 @@
 FastAPI ML Service - Main Application
 Fish Harvest Forecast API
 """
-from datetime import datetime
-from typing import Optional, List
+from typing import Optional, List, Tuple
 from fastapi import FastAPI, HTTPException, status, Depends, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from sqlalchemy.orm import Session
+from fastapi.openapi.utils import get_openapi
+from fastapi.responses import ORJSONResponse, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 import logging
+import time
+import uuid
+import msgspec
+import orjson
 
 from app.config import settings
 from app.models import (
@@ -17,11 +22,11 @@ from app.models import (
     ErrorResponse,
     HealthResponse,
     ModelListResponse,
-    ModelInfo
+    PredictionPoint
 )
-from app.predictor import predictor
+from app.predictor import ModelNotAvailableError, predictor
 from app.database import init_db, create_tables, get_db, is_db_available
-from app import crud
+from app import crud, batch_writer
 
 # Configure logging
 logging.basicConfig(
@@ -30,6 +35,45 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Pre-serialized /health and /models bodies. Only the health timestamp changes
+# per request, so it is appended to an encoded prefix. Both are re-encoded when
+# predictor.state_version changes, i.e. after a model loaded or failed to load.
+_HEALTH_PREFIX: bytes = b""
+_MODELS_BODY: bytes = b""
+_BODIES_VERSION = -1
+_CACHE_HEADERS = {"Cache-Control": "max-age=10"}
+
+
+def utc_timestamp() -> str:
+    """Current UTC time as an ISO-8601 string with a Z suffix (second precision)"""
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+
+
+def _encoded_bodies() -> Tuple[bytes, bytes]:
+    """
+    Encoded /health prefix and /models body for the current model state
+    
+    Re-encoded only when predictor.state_version has moved since the last call.
+    """
+    global _HEALTH_PREFIX, _MODELS_BODY, _BODIES_VERSION
+    
+    version = predictor.state_version
+    if version != _BODIES_VERSION:
+        health_body = orjson.dumps({
+            "status": "healthy",
+            "version": settings.version,
+            "models_loaded": {
+                "tilapia": predictor.is_model_loaded("tilapia"),
+                "bangus": predictor.is_model_loaded("bangus")
+            }
+        })
+        _HEALTH_PREFIX = health_body[:-1] + b',"timestamp":"'
+        models_info = predictor.get_all_models_info()
+        _MODELS_BODY = orjson.dumps({"models": models_info, "count": len(models_info)})
+        _BODIES_VERSION = version
+    return _HEALTH_PREFIX, _MODELS_BODY
+
+
 # Create FastAPI app
 app = FastAPI(
     title=settings.app_name,
@@ -37,13 +81,38 @@ app = FastAPI(
     description="ML Service for Fish Harvest Forecasting - Tilapia and Bangus",
     docs_url="/docs",
     redoc_url="/redoc",
-    openapi_url="/openapi.json"
+    openapi_url="/openapi.json",
+    default_response_class=ORJSONResponse
 )
 
+
+def custom_openapi():
+    """OpenAPI schema including the msgspec forecast response components"""
+    if app.openapi_schema:
+        return app.openapi_schema
+    
+    openapi_schema = get_openapi(
+        title=app.title,
+        version=app.version,
+        description=app.description,
+        routes=app.routes
+    )
+    _, components = msgspec.json.schema_components(
+        [PredictionResponse],
+        ref_template="#/components/schemas/{name}"
+    )
+    openapi_schema.setdefault("components", {}).setdefault("schemas", {}).update(components)
+    app.openapi_schema = openapi_schema
+    return app.openapi_schema
+
+
+app.openapi = custom_openapi
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.cors_origins,
+    allow_origin_regex=settings.allowed_origin_regex,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
@@ -56,11 +125,15 @@ async def startup_event():
     logger.info(f"Starting {settings.app_name} v{settings.version}")
     logger.info(f"Environment: {settings.environment}")
     logger.info(f"API Prefix: {settings.api_prefix}")
-    logger.info(f"Models loaded: {list(predictor.models.keys())}")
+    logger.info(f"Models available: {[s for s in ('tilapia', 'bangus') if predictor.is_model_loaded(s)]}")
+    
+    # Pre-serialize the health and model list responses
+    _encoded_bodies()
     
     # Initialize database
-    if init_db():
-        create_tables()
+    if await init_db():
+        await create_tables()
+        batch_writer.start()
         logger.info("Database features enabled")
     else:
         logger.warning("Database features disabled - predictions will not be saved")
@@ -70,6 +143,7 @@ async def startup_event():
 async def shutdown_event():
     """Run on application shutdown"""
     logger.info("Shutting down ML Service")
+    await batch_writer.stop()
 
 
 @app.get("/", tags=["Root"])
@@ -97,16 +171,13 @@ async def health_check():
     
     Returns the service status and loaded models information
     """
-    models_status = {
-        "tilapia": predictor.is_model_loaded("tilapia"),
-        "bangus": predictor.is_model_loaded("bangus")
-    }
+    timestamp = utc_timestamp()
+    health_prefix, _ = _encoded_bodies()
     
-    return HealthResponse(
-        status="healthy",
-        version=settings.version,
-        models_loaded=models_status,
-        timestamp=datetime.utcnow().isoformat() + "Z"
+    return Response(
+        content=health_prefix + timestamp.encode() + b'"}',
+        media_type="application/json",
+        headers=_CACHE_HEADERS
     )
 
 
@@ -119,20 +190,79 @@ async def list_models():
     """
     List all available models
     
-    Returns information about all loaded ML models
+    Returns information about all available ML models and whether they are loaded yet
     """
-    models_info = predictor.get_all_models_info()
+    _, models_body = _encoded_bodies()
     
-    return ModelListResponse(
-        models=models_info,
-        count=len(models_info)
+    return Response(
+        content=models_body,
+        media_type="application/json",
+        headers=_CACHE_HEADERS
+    )
+
+
+def _forecast_response(
+    request: PredictionRequest,
+    predictions: List[PredictionPoint],
+    http_request: Request
+) -> PredictionResponse:
+    """
+    Queue a finished forecast for saving and build its response
+    
+    Args:
+        request: Validated forecast request
+        predictions: Prediction points generated for the request
+        http_request: Incoming HTTP request (client IP and user agent)
+    
+    Returns:
+        Forecast response for the request
+    """
+    # Get model info
+    model_info = predictor.get_model_info_response(request.species)
+    
+    # Queue for the batch writer if the database is available, off the response path
+    request_id = None
+    if batch_writer.is_running():
+        new_request_id = str(uuid.uuid4())
+        queued = batch_writer.enqueue(
+            request_id=new_request_id,
+            species=request.species,
+            province=request.province,
+            city=request.city,
+            date_from=request.date_from,
+            date_to=request.date_to,
+            predictions=predictions,
+            ip_address=http_request.client.host if http_request.client else None,
+            user_agent=http_request.headers.get("user-agent")
+        )
+        # Only hand out IDs of forecasts that will actually be saved
+        if queued:
+            request_id = new_request_id
+    
+    # Create response
+    return PredictionResponse(
+        success=True,
+        predictions=predictions,
+        model_info=model_info,
+        metadata={
+            "province": request.province,
+            "city": request.city,
+            "date_from": request.date_from,
+            "date_to": request.date_to,
+            "prediction_count": len(predictions),
+            "request_id": request_id,
+            "timestamp": utc_timestamp()
+        }
     )
 
 
 @app.post(
     f"{settings.api_prefix}/predict",
-    response_model=PredictionResponse,
     responses={
+        200: {
+            "description": "Successful Response",
+            "content": {"application/json": {"schema": {"$ref": "#/components/schemas/PredictionResponse"}}}
+        },
         400: {"model": ErrorResponse},
         404: {"model": ErrorResponse},
         500: {"model": ErrorResponse}
@@ -141,8 +271,7 @@ async def list_models():
 )
 async def predict_prices(
     request: PredictionRequest,
-    http_request: Request,
-    db: Optional[Session] = Depends(get_db)
+    http_request: Request
 ):
     """
     Forecast fish harvest for a given date range (by month)
@@ -165,15 +294,16 @@ async def predict_prices(
     try:
         logger.info(f"Harvest forecast request: {request.species} from {request.date_from} to {request.date_to}")
         
-        # Check if model is loaded
+        # Check if model is available
         if not predictor.is_model_loaded(request.species):
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Model for {request.species} is not available"
             )
         
-        # Make harvest forecasts
-        predictions = predictor.predict(
+        # Make harvest forecasts (CPU-bound, so keep it off the event loop)
+        predictions = await run_in_threadpool(
+            predictor.predict,
             species=request.species,
             date_from=request.date_from,
             date_to=request.date_to,
@@ -181,68 +311,100 @@ async def predict_prices(
             city=request.city
         )
         
-        # Get model info
-        model_info_dict = predictor.get_model_info(request.species)
-        model_info = ModelInfo(
-            model_name=model_info_dict['name'],
-            species=model_info_dict['species'],
-            version=model_info_dict['version'],
-            last_trained=model_info_dict.get('last_trained'),
-            features_used=model_info_dict.get('features_used')
+        response = _forecast_response(request, predictions, http_request)
+        
+        logger.info(f"Harvest forecast successful: {len(predictions)} points generated")
+        return Response(content=msgspec.json.encode(response), media_type="application/json")
+        
+    except HTTPException:
+        raise
+    except ModelNotAvailableError as e:
+        logger.error(f"Model not available: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
         )
+    except ValueError as e:
+        logger.error(f"Validation error: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        logger.error(f"Harvest forecast error: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Internal server error: {str(e)}"
+        )
+
+
+@app.post(
+    f"{settings.api_prefix}/predict/batch",
+    responses={
+        200: {
+            "description": "Successful Response",
+            "content": {
+                "application/json": {
+                    "schema": {"type": "array", "items": {"$ref": "#/components/schemas/PredictionResponse"}}
+                }
+            }
+        },
+        400: {"model": ErrorResponse},
+        404: {"model": ErrorResponse},
+        500: {"model": ErrorResponse}
+    },
+    tags=["Predictions"]
+)
+async def predict_batch(
+    requests: List[PredictionRequest],
+    http_request: Request
+):
+    """
+    Forecast fish harvest for several requests in one call
+    
+    Accepts a list of forecast requests (same fields as `/predict`) and returns
+    one forecast response per request, in the same order. Requests for the same
+    species are predicted together in a single model call.
+    
+    **Returns:**
+    - List of forecast responses, one per request
+    """
+    try:
+        logger.info(f"Batch harvest forecast request: {len(requests)} requests")
         
-        # Save to database if available
-        request_id = None
-        if is_db_available():
-            try:
-                # Get client info
-                client_ip = http_request.client.host if http_request.client else None
-                user_agent = http_request.headers.get("user-agent")
-                
-                # Create prediction request record
-                db_request = crud.create_prediction_request(
-                    db=db,
-                    species=request.species,
-                    province=request.province,
-                    city=request.city,
-                    date_from=request.date_from,
-                    date_to=request.date_to,
-                    ip_address=client_ip,
-                    user_agent=user_agent
-                )
-                request_id = db_request.request_id
-                
-                # Save predictions
-                crud.create_predictions(
-                    db=db,
-                    request_id=request_id,
-                    predictions=predictions
+        if len(requests) > settings.max_batch_requests:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Batch exceeds maximum of {settings.max_batch_requests} requests"
+            )
+        
+        # Check if all requested models are available
+        for request in requests:
+            if not predictor.is_model_loaded(request.species):
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Model for {request.species} is not available"
                 )
-                
-                logger.info(f"Harvest forecasts saved to database with request_id: {request_id}")
-            except Exception as db_error:
-                logger.error(f"Failed to save to database: {db_error}")
-                # Continue even if database save fails
         
-        # Create response
-        response = PredictionResponse(
-            success=True,
-            predictions=predictions,
-            model_info=model_info,
-            metadata={
-                "province": request.province,
-                "city": request.city,
-                "date_from": request.date_from,
-                "date_to": request.date_to,
-                "prediction_count": len(predictions),
-                "request_id": request_id,
-                "timestamp": datetime.utcnow().isoformat() + "Z"
-            }
-        )
+        # Make harvest forecasts (CPU-bound, so keep it off the event loop)
+        batch_predictions = await run_in_threadpool(predictor.predict_batch, requests)
         
-        logger.info(f"Harvest forecast successful: {len(predictions)} points generated")
-        return response
+        responses = [
+            _forecast_response(request, predictions, http_request)
+            for request, predictions in zip(requests, batch_predictions)
+        ]
+        
+        logger.info(f"Batch harvest forecast successful: {sum(len(p) for p in batch_predictions)} points generated")
+        return Response(content=msgspec.json.encode(responses), media_type="application/json")
         
+    except HTTPException:
+        raise
+    except ModelNotAvailableError as e:
+        logger.error(f"Model not available: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
     except ValueError as e:
         logger.error(f"Validation error: {e}")
         raise HTTPException(
@@ -250,7 +412,7 @@ async def predict_prices(
             detail=str(e)
         )
     except Exception as e:
-        logger.error(f"Harvest forecast error: {e}", exc_info=True)
+        logger.error(f"Batch harvest forecast error: {e}", exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Internal server error: {str(e)}"
@@ -267,7 +429,7 @@ async def get_saved_predictions(
     city: Optional[str] = None,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Get saved harvest forecast requests with optional filters
@@ -289,7 +451,7 @@ async def get_saved_predictions(
         )
     
     try:
-        requests = crud.get_prediction_requests(
+        requests = await crud.get_prediction_requests(
             db=db,
             species=species,
             province=province,
@@ -298,7 +460,7 @@ async def get_saved_predictions(
             limit=min(limit, 100)
         )
         
-        total_count = crud.get_request_count(
+        total_count = await crud.get_request_count(
             db=db,
             species=species,
             province=province,
@@ -313,12 +475,12 @@ async def get_saved_predictions(
                     "species": req.species,
                     "province": req.province,
                     "city": req.city,
-                    "date_from": req.date_from.isoformat(),
-                    "date_to": req.date_to.isoformat(),
-                    "created_at": req.created_at.isoformat(),
-                    "prediction_count": len(req.predictions)
+                    "date_from": req.date_from,
+                    "date_to": req.date_to,
+                    "created_at": req.created_at,
+                    "prediction_count": prediction_count
                 }
-                for req in requests
+                for req, prediction_count in requests
             ],
             "total": total_count,
             "skip": skip,
@@ -338,7 +500,7 @@ async def get_saved_predictions(
 )
 async def get_prediction_by_id(
     request_id: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Get a specific harvest forecast request and all its forecasts
@@ -356,7 +518,7 @@ async def get_prediction_by_id(
         )
     
     try:
-        db_request = crud.get_prediction_request(db, request_id)
+        db_request = await crud.get_prediction_request(db, request_id)
         
         if not db_request:
             raise HTTPException(
@@ -364,7 +526,7 @@ async def get_prediction_by_id(
                 detail=f"Harvest forecast request {request_id} not found"
             )
         
-        predictions = crud.get_predictions_by_request(db, request_id)
+        predictions = await crud.get_predictions_by_request(db, db_request.id)
         
         return {
             "success": True,
@@ -373,20 +535,12 @@ async def get_prediction_by_id(
                 "species": db_request.species,
                 "province": db_request.province,
                 "city": db_request.city,
-                "date_from": db_request.date_from.isoformat(),
-                "date_to": db_request.date_to.isoformat(),
-                "created_at": db_request.created_at.isoformat(),
+                "date_from": db_request.date_from,
+                "date_to": db_request.date_to,
+                "created_at": db_request.created_at,
                 "ip_address": db_request.ip_address
             },
-            "predictions": [
-                {
-                    "date": pred.prediction_date.isoformat(),
-                    "predicted_harvest": float(pred.predicted_price),
-                    "confidence_lower": float(pred.confidence_lower) if pred.confidence_lower else None,
-                    "confidence_upper": float(pred.confidence_upper) if pred.confidence_upper else None
-                }
-                for pred in predictions
-            ],
+            "predictions": predictions,
             "prediction_count": len(predictions)
         }
     except HTTPException:
@@ -405,7 +559,7 @@ async def get_prediction_by_id(
 )
 async def delete_prediction(
     request_id: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Delete a harvest forecast request and all its forecasts
@@ -423,7 +577,7 @@ async def delete_prediction(
         )
     
     try:
-        deleted = crud.delete_prediction_request(db, request_id)
+        deleted = await crud.delete_prediction_request(db, request_id)
         
         if not deleted:
             raise HTTPException(
@@ -448,7 +602,7 @@ async def delete_prediction(
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request, exc):
     """Custom HTTP exception handler"""
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=exc.status_code,
         content={
             "success": False,
@@ -462,7 +616,7 @@ async def http_exception_handler(request, exc):
 async def general_exception_handler(request, exc):
     """General exception handler"""
     logger.error(f"Unhandled exception: {exc}", exc_info=True)
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
         content={
             "success": False,
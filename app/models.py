@@ -1,23 +1,27 @@
 """
-Pydantic models for request/response validation
+Pydantic models for request validation and msgspec structs for forecast responses
 """
-from datetime import date, datetime
-from typing import List, Optional, Dict, Any
-from pydantic import BaseModel, Field, validator
+from datetime import date
+from typing import Annotated, List, Optional, Dict, Any
+import msgspec
+from msgspec import Meta
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+
+SUPPORTED_SPECIES = frozenset({"tilapia", "bangus"})
 
 
 class PredictionRequest(BaseModel):
     """Request model for harvest forecast"""
     
     species: str = Field(..., description="Fish species (tilapia or bangus)")
-    date_from: str = Field(..., alias="dateFrom", description="Start date (YYYY-MM-DD)")
-    date_to: str = Field(..., alias="dateTo", description="End date (YYYY-MM-DD)")
+    date_from: date = Field(..., alias="dateFrom", description="Start date (YYYY-MM-DD)")
+    date_to: date = Field(..., alias="dateTo", description="End date (YYYY-MM-DD)")
     province: str = Field(..., description="Province name")
     city: str = Field(..., description="City/Municipality name")
     
-    class Config:
-        populate_by_name = True
-        json_schema_extra = {
+    model_config = ConfigDict(
+        populate_by_name=True,
+        json_schema_extra={
             "example": {
                 "species": "tilapia",
                 "dateFrom": "2024-01-01",
@@ -26,120 +30,62 @@ class PredictionRequest(BaseModel):
                 "city": "Mexico"
             }
         }
+    )
     
-    @validator("species")
-    def validate_species(cls, v):
+    @field_validator("species")
+    @classmethod
+    def validate_species(cls, v: str) -> str:
         """Validate species is either tilapia or bangus"""
         v = v.lower()
-        if v not in ["tilapia", "bangus"]:
+        if v not in SUPPORTED_SPECIES:
             raise ValueError("Species must be either 'tilapia' or 'bangus'")
         return v
-    
-    @validator("date_from", "date_to")
-    def validate_date_format(cls, v):
-        """Validate date format"""
-        try:
-            datetime.strptime(v, "%Y-%m-%d")
-            return v
-        except ValueError:
-            raise ValueError("Date must be in YYYY-MM-DD format")
 
 
-class InputFeatures(BaseModel):
+# Forecast response DTOs are msgspec Structs: they only carry server-generated
+# data, so they skip validation and are encoded directly by msgspec.json
+
+class InputFeatures(msgspec.Struct, frozen=True):
     """Input features used for prediction"""
     
-    fingerlings: float = Field(..., description="Number of fingerlings")
-    survival_rate: float = Field(..., description="Survival rate (0-1)")
-    avg_weight: float = Field(..., description="Average weight (kg)")
-    
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "fingerlings": 1000.0,
-                "survival_rate": 0.85,
-                "avg_weight": 0.25
-            }
-        }
+    fingerlings: Annotated[float, Meta(description="Number of fingerlings", examples=[1000.0])]
+    survival_rate: Annotated[float, Meta(description="Survival rate (0-1)", examples=[0.85])]
+    avg_weight: Annotated[float, Meta(description="Average weight (kg)", examples=[0.25])]
 
 
-class PredictionPoint(BaseModel):
+class PredictionPoint(msgspec.Struct, frozen=True):
     """Single harvest forecast point"""
     
-    date: str = Field(..., description="Forecast date (YYYY-MM-DD)")
-    predicted_harvest: float = Field(..., description="Predicted harvest amount (kg)")
-    input_features: InputFeatures = Field(..., description="Input features used for this prediction")
-    confidence_lower: Optional[float] = Field(None, description="Lower confidence bound")
-    confidence_upper: Optional[float] = Field(None, description="Upper confidence bound")
-    
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "date": "2024-01-15",
-                "predicted_harvest": 1250.50,
-                "input_features": {
-                    "fingerlings": 1000.0,
-                    "survival_rate": 0.85,
-                    "avg_weight": 0.25
-                },
-                "confidence_lower": 1100.00,
-                "confidence_upper": 1400.00
-            }
-        }
+    date: Annotated[str, Meta(description="Forecast date (YYYY-MM-DD)", examples=["2024-01-15"])]
+    predicted_harvest: Annotated[float, Meta(description="Predicted harvest amount (kg)", examples=[1250.50])]
+    input_features: Annotated[InputFeatures, Meta(description="Input features used for this prediction")]
+    confidence_lower: Annotated[Optional[float], Meta(description="Lower confidence bound", examples=[1100.00])] = None
+    confidence_upper: Annotated[Optional[float], Meta(description="Upper confidence bound", examples=[1400.00])] = None
 
 
-class ModelInfo(BaseModel):
+class ModelInfo(msgspec.Struct, frozen=True):
     """Information about the ML model used"""
     
-    model_name: str = Field(..., description="Name of the model")
-    species: str = Field(..., description="Fish species")
-    version: str = Field(..., description="Model version")
-    last_trained: Optional[str] = Field(None, description="Last training date")
-    features_used: Optional[List[str]] = Field(None, description="Features used in the model")
-    
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "model_name": "Tilapia Harvest Forecast Model",
-                "species": "tilapia",
-                "version": "1.0.0",
-                "last_trained": "2024-01-01",
-                "features_used": ["month", "province", "city", "avg_weight", "fingerlings", "survival_rate"]
-            }
-        }
+    model_name: Annotated[str, Meta(description="Name of the model", examples=["Tilapia Harvest Forecast Model"])]
+    species: Annotated[str, Meta(description="Fish species", examples=["tilapia"])]
+    version: Annotated[str, Meta(description="Model version", examples=["1.0.0"])]
+    last_trained: Annotated[Optional[str], Meta(description="Last training date", examples=["2024-01-01"])] = None
+    features_used: Annotated[
+        Optional[List[str]],
+        Meta(description="Features used in the model", examples=[["Fingerlings", "SurvivalRate", "AvgWeight"]])
+    ] = None
 
 
-class PredictionResponse(BaseModel):
+class PredictionResponse(msgspec.Struct, frozen=True):
     """Response model for harvest forecast"""
     
-    success: bool = Field(..., description="Whether forecast was successful")
-    predictions: List[PredictionPoint] = Field(..., description="List of harvest forecasts")
-    model_info: ModelInfo = Field(..., description="Information about the model used")
-    metadata: Dict[str, Any] = Field(default_factory=dict, description="Additional metadata")
-    
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "success": True,
-                "predictions": [
-                    {
-                        "date": "2024-01-01",
-                        "predicted_harvest": 1250.50,
-                        "confidence_lower": 1100.00,
-                        "confidence_upper": 1400.00
-                    }
-                ],
-                "model_info": {
-                    "model_name": "Tilapia Harvest Forecast Model",
-                    "species": "tilapia",
-                    "version": "1.0.0"
-                },
-                "metadata": {
-                    "province": "Pampanga",
-                    "city": "Mexico",
-                    "forecast_count": 12
-                }
-            }
-        }
+    success: Annotated[bool, Meta(description="Whether forecast was successful")]
+    predictions: Annotated[List[PredictionPoint], Meta(description="List of harvest forecasts")]
+    model_info: Annotated[ModelInfo, Meta(description="Information about the model used")]
+    metadata: Annotated[
+        Dict[str, Any],
+        Meta(description="Additional metadata", examples=[{"province": "Pampanga", "city": "Mexico", "prediction_count": 12}])
+    ] = {}
 
 
 class ErrorResponse(BaseModel):
@@ -149,14 +95,16 @@ class ErrorResponse(BaseModel):
     error: str = Field(..., description="Error message")
     detail: Optional[str] = Field(None, description="Detailed error information")
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        defer_build=True,
+        json_schema_extra={
             "example": {
                 "success": False,
                 "error": "Model not found",
                 "detail": "The requested model file does not exist"
             }
         }
+    )
 
 
 class HealthResponse(BaseModel):
@@ -167,8 +115,9 @@ class HealthResponse(BaseModel):
     models_loaded: Dict[str, bool] = Field(..., description="Status of loaded models")
     timestamp: str = Field(..., description="Current timestamp")
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        defer_build=True,
+        json_schema_extra={
             "example": {
                 "status": "healthy",
                 "version": "1.0.0",
@@ -179,6 +128,7 @@ class HealthResponse(BaseModel):
                 "timestamp": "2024-01-15T10:30:00Z"
             }
         }
+    )
 
 
 class ModelListResponse(BaseModel):
@@ -187,8 +137,9 @@ class ModelListResponse(BaseModel):
     models: List[Dict[str, Any]] = Field(..., description="List of available models")
     count: int = Field(..., description="Number of models")
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        defer_build=True,
+        json_schema_extra={
             "example": {
                 "models": [
                     {
@@ -207,3 +158,4 @@ class ModelListResponse(BaseModel):
                 "count": 2
             }
         }
+    )
@@ -5,18 +5,108 @@ Handles loading models and making harvest forecasts
 import os
 import pickle
 import logging
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
+import threading
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import msgspec
 import pandas as pd
 import numpy as np
 
 from app.config import settings
-from app.models import PredictionPoint, ModelInfo
+from app.models import PredictionPoint, PredictionRequest, PredictionResponse, ModelInfo, InputFeatures
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Default values for aquaculture features (these are typical averages)
+# These can be adjusted based on historical data or user input
+DEFAULT_FEATURE_VALUES = {
+    'Fingerlings': 5000,  # typical stocking density per pond
+    'SurvivalRate': 85.0,  # percentage - typical survival rate
+    'AvgWeight': 250.0  # grams - typical market weight for tilapia/bangus
+}
+
+
+class ModelNotAvailableError(ValueError):
+    """Raised when no model can be loaded for the requested species"""
+
+
+def _month_starts(start: date, end: date) -> List[date]:
+    """
+    List the first day of every month within [start, end]
+    
+    Same dates as pd.date_range(start, end, freq='MS') without building a DatetimeIndex.
+    """
+    year, month = start.year, start.month
+    if start.day > 1:
+        # A mid-month start date rolls forward to the next month start
+        year, month = year + month // 12, month % 12 + 1
+    
+    month_starts = []
+    while (year, month) <= (end.year, end.month):
+        month_starts.append(date(year, month, 1))
+        year, month = year + month // 12, month % 12 + 1
+    return month_starts
+
+
+# Linear estimators whose predict is exactly features @ coef_ + intercept_.
+# GLMs (PoissonRegressor, GammaRegressor, TweedieRegressor) apply an inverse
+# link on top of that and must keep using their own predict.
+try:
+    from sklearn.linear_model import (
+        ARDRegression,
+        BayesianRidge,
+        ElasticNet,
+        ElasticNetCV,
+        HuberRegressor,
+        Lars,
+        Lasso,
+        LassoCV,
+        LassoLars,
+        LinearRegression,
+        Ridge,
+        RidgeCV
+    )
+    IDENTITY_LINK_MODELS = (
+        ARDRegression,
+        BayesianRidge,
+        ElasticNet,
+        ElasticNetCV,
+        HuberRegressor,
+        Lars,
+        Lasso,
+        LassoCV,
+        LassoLars,
+        LinearRegression,
+        Ridge,
+        RidgeCV
+    )
+except ImportError:
+    IDENTITY_LINK_MODELS = ()
+
+
+def _linear_predict(model: Any) -> Optional[Callable[[np.ndarray], np.ndarray]]:
+    """
+    Build a direct evaluator for fitted single-output identity-link linear models
+    
+    Computes features @ coef_ + intercept_ (what predict does for the estimators in
+    IDENTITY_LINK_MODELS) without sklearn's per-call input validation. Only exact
+    types are accepted, since a subclass may override predict. Returns None for any
+    other model, which keeps using its own predict method.
+    """
+    if type(model) not in IDENTITY_LINK_MODELS:
+        return None
+    
+    coef = getattr(model, 'coef_', None)
+    intercept = getattr(model, 'intercept_', None)
+    if coef is None or intercept is None or np.ndim(coef) != 1 or np.ndim(intercept) != 0:
+        return None
+    
+    coef = np.array(coef, dtype=np.float64)
+    intercept = float(intercept)
+    return lambda features: features @ coef + intercept
+
 
 class ModelPredictor:
     """Handles ML model loading and predictions"""
@@ -25,25 +115,88 @@ class ModelPredictor:
         """Initialize the predictor"""
         self.models: Dict[str, Any] = {}
         self.model_info: Dict[str, Dict] = {}
-        self._load_models()
+        # Per-species default feature row and its column Index, built at load time
+        self._default_row: Dict[str, np.ndarray] = {}
+        self._feature_columns: Dict[str, pd.Index] = {}
+        self._feature_index: Dict[str, Dict[str, int]] = {}
+        # Bound predict methods and capability checks, resolved once per loaded model
+        self._model_meta: Dict[str, Dict[str, Any]] = {}
+        # Immutable ModelInfo per species, shared by every forecast response
+        self._model_info_obj: Dict[str, ModelInfo] = {}
+        # Model files found at startup; each is loaded on first use under its lock
+        self._model_paths: Dict[str, Tuple[str, str]] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        # Bumped whenever a model load succeeds or fails, so callers caching
+        # anything derived from model availability know when to rebuild it
+        self.state_version = 0
+        self._register_models()
     
-    def _load_models(self):
-        """Load all available models"""
-        logger.info("Loading ML models...")
+    def _register_models(self):
+        """Record available model files without loading them"""
+        model_files = [
+            ('tilapia', settings.tilapia_model_path, 'Tilapia Harvest Forecast Model'),
+            ('bangus', settings.bangus_model_path, 'Bangus Harvest Forecast Model')
+        ]
         
-        # Load Tilapia model
-        if os.path.exists(settings.tilapia_model_path):
-            self._load_single_model('tilapia', settings.tilapia_model_path, 'Tilapia Harvest Forecast Model')
-        else:
-            logger.warning(f"✗ Tilapia model not found at {settings.tilapia_model_path}")
+        for species, model_path, model_name in model_files:
+            if os.path.exists(model_path):
+                self._model_paths[species] = (model_path, model_name)
+                self._locks[species] = threading.Lock()
+                self.model_info[species] = {
+                    'name': model_name,
+                    'species': species,
+                    'version': '1.0.0',
+                    'path': model_path,
+                    'features_used': None,
+                    'last_trained': datetime.fromtimestamp(os.path.getmtime(model_path)).strftime('%Y-%m-%d')
+                }
+            else:
+                logger.warning(f"✗ {species.capitalize()} model not found at {model_path}")
         
-        # Load Bangus model
-        if os.path.exists(settings.bangus_model_path):
-            self._load_single_model('bangus', settings.bangus_model_path, 'Bangus Harvest Forecast Model')
-        else:
-            logger.warning(f"✗ Bangus model not found at {settings.bangus_model_path}")
+        logger.info(f"Models available (loaded on first use): {list(self._model_paths.keys())}")
+    
+    def _get_model(self, species: str) -> Optional[Any]:
+        """Return the model for a species, loading and warming it up on first use"""
+        model = self.models.get(species)
+        if model is not None:
+            return model
+        
+        lock = self._locks.get(species)
+        if lock is None:
+            return None
+        
+        with lock:
+            # A previous holder of the lock may have loaded it or given up on it
+            if species not in self.models and species in self._model_paths:
+                model_path, model_name = self._model_paths[species]
+                self._load_single_model(species, model_path, model_name)
+                if species in self.models:
+                    self._warmup(species)
+                else:
+                    # Stop advertising a model file that cannot be loaded
+                    self._model_paths.pop(species, None)
+                    self.model_info.pop(species, None)
+                self.state_version += 1
         
-        logger.info(f"Models loaded: {list(self.models.keys())}")
+        return self.models.get(species)
+    
+    def _warmup(self, species: str):
+        """
+        Run one synthetic forecast right after a model is loaded
+        
+        Materializes sklearn/numpy lazy imports and dispatch caches and the msgspec
+        response encoder, so the first real forecast does not pay for them.
+        """
+        try:
+            points = self.predict(species, date(2024, 1, 1), date(2024, 1, 1), "warmup", "warmup")
+            msgspec.json.encode(PredictionResponse(
+                success=True,
+                predictions=points,
+                model_info=self._model_info_obj[species]
+            ))
+            logger.info(f"✓ {species.capitalize()} model warmed up")
+        except Exception as e:
+            logger.warning(f"✗ Warmup failed for {species} model: {e}")
     
     def _load_single_model(self, species: str, model_path: str, model_name: str):
         """Load a single model with multiple fallback methods"""
@@ -53,10 +206,11 @@ class ModelPredictor:
             ('default', lambda f: pickle.load(f)),
         ]
         
-        # Try joblib if available (common for scikit-learn models)
+        # Try joblib if available (common for scikit-learn models). mmap_mode='r'
+        # memory-maps numpy arrays so forked workers share them via the page cache
         try:
             import joblib
-            loading_methods.insert(0, ('joblib', lambda f: joblib.load(model_path)))
+            loading_methods.insert(0, ('joblib', lambda f: joblib.load(model_path, mmap_mode='r')))
         except ImportError:
             pass
         
@@ -89,7 +243,23 @@ class ModelPredictor:
                     mtime = os.path.getmtime(model_path)
                     last_trained = datetime.fromtimestamp(mtime).strftime('%Y-%m-%d')
                 
-                self.models[species] = model
+                # Features in the exact order the model expects; any feature without
+                # a known default is filled with 0
+                columns = pd.Index(features_used)
+                self._feature_columns[species] = columns
+                self._feature_index[species] = {name: i for i, name in enumerate(features_used)}
+                linear_predict = _linear_predict(model)
+                self._model_meta[species] = {
+                    'predict': linear_predict or model.predict,
+                    'predict_interval': getattr(model, 'predict_interval', None),
+                    # Models fitted on named columns get a DataFrame (sklearn warns
+                    # otherwise); everything else is fed the numpy array directly
+                    'uses_feature_names': linear_predict is None and hasattr(model, 'feature_names_in_')
+                }
+                self._default_row[species] = np.array(
+                    [DEFAULT_FEATURE_VALUES.get(name, 0.0) for name in features_used],
+                    dtype=np.float32  # Half the bandwidth of float64; predictions are upcast
+                )
                 self.model_info[species] = {
                     'name': model_name,
                     'species': species,
@@ -98,6 +268,16 @@ class ModelPredictor:
                     'features_used': features_used,
                     'last_trained': last_trained
                 }
+                self._model_info_obj[species] = ModelInfo(
+                    model_name=model_name,
+                    species=species,
+                    version='1.0.0',
+                    last_trained=last_trained,
+                    features_used=features_used
+                )
+                # Publish the model last: lock-free readers in _get_model treat its
+                # presence as "all per-species caches are ready"
+                self.models[species] = model
                 logger.info(f"✓ {species.capitalize()} model loaded successfully using {method_name}")
                 return
             except Exception as e:
@@ -107,27 +287,32 @@ class ModelPredictor:
         logger.error(f"✗ Failed to load {species} model with all methods")
     
     def is_model_loaded(self, species: str) -> bool:
-        """Check if a model is loaded"""
-        return species.lower() in self.models
+        """Check if a model is loaded or available to load on first use"""
+        species = species.lower()
+        return species in self.models or species in self._model_paths
     
     def get_model_info(self, species: str) -> Optional[Dict]:
         """Get information about a loaded model"""
         return self.model_info.get(species.lower())
     
+    def get_model_info_response(self, species: str) -> Optional[ModelInfo]:
+        """Get the cached ModelInfo response object of a loaded model"""
+        return self._model_info_obj.get(species.lower())
+    
     def get_all_models_info(self) -> List[Dict]:
         """Get information about all loaded models"""
         models_list = []
         for species, info in self.model_info.items():
             model_data = info.copy()
-            model_data['status'] = 'loaded' if self.is_model_loaded(species) else 'not_loaded'
+            model_data['status'] = 'loaded' if species in self.models else 'not_loaded'
             models_list.append(model_data)
         return models_list
     
     def predict(
         self,
         species: str,
-        date_from: str,
-        date_to: str,
+        date_from: date,
+        date_to: date,
         province: str,
         city: str
     ) -> List[PredictionPoint]:
@@ -136,8 +321,8 @@ class ModelPredictor:
         
         Args:
             species: Fish species (tilapia or bangus)
-            date_from: Start date (YYYY-MM-DD)
-            date_to: End date (YYYY-MM-DD)
+            date_from: Start date (already parsed by the request model)
+            date_to: End date (already parsed by the request model)
             province: Province name
             city: City/Municipality name
         
@@ -146,97 +331,180 @@ class ModelPredictor:
         """
         species = species.lower()
         
-        # Check if model is loaded
-        if not self.is_model_loaded(species):
-            raise ValueError(f"Model for {species} is not loaded")
+        # Load the model on first use
+        if self._get_model(species) is None:
+            raise ModelNotAvailableError(f"Model for {species} is not loaded")
         
-        # Parse dates
-        start_date = datetime.strptime(date_from, "%Y-%m-%d")
-        end_date = datetime.strptime(date_to, "%Y-%m-%d")
-        
-        # Validate date range
-        if end_date < start_date:
-            raise ValueError("End date must be after start date")
-        
-        days_diff = (end_date - start_date).days + 1
-        if days_diff > settings.max_forecast_days:
-            raise ValueError(f"Date range exceeds maximum of {settings.max_forecast_days} days")
-        
-        # Generate date range (monthly basis for harvest forecasts)
-        date_range = pd.date_range(start=start_date, end=end_date, freq='MS')  # MS = Month Start
+        month_starts = self._forecast_months(date_from, date_to)
         
         # Prepare features for prediction
-        features_df = self._prepare_features(
-            date_range=date_range,
+        features = self._prepare_features(
+            n_predictions=len(month_starts),
             province=province,
             city=city,
             species=species
         )
         
-        # Get model
-        model = self.models[species]
-        
         # Make predictions
         try:
-            predictions = model.predict(features_df)
+            predicted_values, intervals = self._run_model(species, features)
+            return self._build_points(species, month_starts, features, predicted_values, intervals)
             
-            # If model supports prediction intervals, get them
-            confidence_intervals = None
-            if hasattr(model, 'predict_interval'):
-                try:
-                    confidence_intervals = model.predict_interval(features_df, alpha=0.05)
-                except:
-                    pass
+        except Exception as e:
+            logger.error(f"Harvest forecast error: {e}")
+            raise ValueError(f"Failed to make harvest forecast: {str(e)}")
+    
+    def predict_batch(self, requests: List[PredictionRequest]) -> List[List[PredictionPoint]]:
+        """
+        Make harvest forecasts for many requests with one model call per species
+        
+        Feature rows of all requests for a species are stacked, predicted together
+        and split back per request.
+        
+        Args:
+            requests: Validated forecast requests
+        
+        Returns:
+            Prediction points for each request, in request order
+        """
+        month_starts: List[List[date]] = []
+        features: List[np.ndarray] = []
+        groups: Dict[str, List[int]] = {}
+        
+        for index, request in enumerate(requests):
+            species = request.species.lower()
+            if self._get_model(species) is None:
+                raise ModelNotAvailableError(f"Model for {species} is not loaded")
             
-            # Create prediction points (harvest forecasts by month)
-            prediction_points = []
-            for i, date in enumerate(date_range):
-                # Get the input features used for this prediction
-                from app.models import InputFeatures
-                input_features = InputFeatures(
-                    fingerlings=float(features_df.iloc[i]['Fingerlings']),
-                    survival_rate=float(features_df.iloc[i]['SurvivalRate']),
-                    avg_weight=float(features_df.iloc[i]['AvgWeight'])
-                )
-                
-                predicted_value = float(predictions[i])
-                
-                # Calculate confidence intervals
-                # If model provides them, use those; otherwise calculate approximate intervals
-                if confidence_intervals is not None:
-                    conf_lower = float(confidence_intervals[i][0])
-                    conf_upper = float(confidence_intervals[i][1])
-                else:
-                    # Calculate approximate 95% confidence interval
-                    # Using ±15% as a reasonable estimate for harvest predictions
-                    # This accounts for natural variability in aquaculture
-                    confidence_margin = predicted_value * 0.15
-                    conf_lower = max(0, predicted_value - confidence_margin)  # Can't be negative
-                    conf_upper = predicted_value + confidence_margin
+            months = self._forecast_months(request.date_from, request.date_to)
+            month_starts.append(months)
+            features.append(self._prepare_features(
+                n_predictions=len(months),
+                province=request.province,
+                city=request.city,
+                species=species
+            ))
+            groups.setdefault(species, []).append(index)
+        
+        results: List[List[PredictionPoint]] = [[] for _ in requests]
+        
+        try:
+            for species, indices in groups.items():
+                # One model call for the whole group, then split at request boundaries
+                stacked = np.vstack([features[i] for i in indices])
+                predicted_values, intervals = self._run_model(species, stacked)
                 
-                point = PredictionPoint(
-                    date=date.strftime("%Y-%m-%d"),
-                    predicted_harvest=predicted_value,
-                    input_features=input_features,
-                    confidence_lower=conf_lower,
-                    confidence_upper=conf_upper
-                )
+                split_at = np.cumsum([len(month_starts[i]) for i in indices])[:-1]
+                predicted_parts = np.split(predicted_values, split_at)
+                interval_parts = np.split(intervals, split_at) if intervals is not None else [None] * len(indices)
                 
-                prediction_points.append(point)
+                for i, part, interval_part in zip(indices, predicted_parts, interval_parts):
+                    results[i] = self._build_points(species, month_starts[i], features[i], part, interval_part)
             
-            return prediction_points
+            return results
             
         except Exception as e:
-            logger.error(f"Harvest forecast error: {e}")
+            logger.error(f"Batch harvest forecast error: {e}")
             raise ValueError(f"Failed to make harvest forecast: {str(e)}")
     
+    def _forecast_months(self, date_from: date, date_to: date) -> List[date]:
+        """Validate a requested date range and list its month starts"""
+        # Validate date range
+        if date_to < date_from:
+            raise ValueError("End date must be after start date")
+        
+        days_diff = (date_to - date_from).days + 1
+        if days_diff > settings.max_forecast_days:
+            raise ValueError(f"Date range exceeds maximum of {settings.max_forecast_days} days")
+        
+        # Monthly basis for harvest forecasts
+        month_starts = _month_starts(date_from, date_to)
+        if not month_starts:
+            # Same 400 for every model type; sklearn would reject 0 samples anyway
+            raise ValueError("Date range must include the first day of at least one month")
+        return month_starts
+    
+    def _run_model(self, species: str, features: np.ndarray):
+        """
+        Run the species model over a feature array
+        
+        Returns:
+            Tuple of (predicted values, (n, 2) confidence intervals or None)
+        """
+        # Get cached model metadata
+        meta = self._model_meta[species]
+        if meta['uses_feature_names']:
+            model_input = pd.DataFrame(features, columns=self._feature_columns[species], copy=False)
+        else:
+            model_input = features
+        
+        predictions = meta['predict'](model_input)
+        
+        # If model supports prediction intervals, get them
+        confidence_intervals = None
+        if meta['predict_interval'] is not None:
+            try:
+                confidence_intervals = meta['predict_interval'](model_input, alpha=0.05)
+            except:
+                pass
+        
+        intervals = None
+        if confidence_intervals is not None:
+            intervals = np.asarray(confidence_intervals, dtype=np.float64)
+        return np.asarray(predictions, dtype=np.float64), intervals
+    
+    def _build_points(
+        self,
+        species: str,
+        month_starts: List[date],
+        features: np.ndarray,
+        predicted_values: np.ndarray,
+        intervals: Optional[np.ndarray]
+    ) -> List[PredictionPoint]:
+        """Turn model output for one request into prediction points"""
+        # Convert whole columns to Python lists at once instead of per-row lookups
+        dates = [month_start.isoformat() for month_start in month_starts]
+        feature_index = self._feature_index[species]
+        fingerlings = features[:, feature_index['Fingerlings']].tolist()
+        survival_rates = features[:, feature_index['SurvivalRate']].tolist()
+        avg_weights = features[:, feature_index['AvgWeight']].tolist()
+        
+        # Calculate confidence intervals
+        # If model provides them, use those; otherwise calculate approximate intervals
+        if intervals is not None:
+            conf_lower = intervals[:, 0].tolist()
+            conf_upper = intervals[:, 1].tolist()
+        else:
+            # Calculate approximate 95% confidence interval
+            # Using ±15% as a reasonable estimate for harvest predictions
+            # This accounts for natural variability in aquaculture
+            confidence_margin = predicted_values * 0.15
+            conf_lower = np.maximum(0.0, predicted_values - confidence_margin).tolist()  # Can't be negative
+            conf_upper = (predicted_values + confidence_margin).tolist()
+        
+        # Create prediction points (harvest forecasts by month)
+        return [
+            PredictionPoint(
+                date=dates[i],
+                predicted_harvest=predicted_value,
+                input_features=InputFeatures(
+                    fingerlings=fingerlings[i],
+                    survival_rate=survival_rates[i],
+                    avg_weight=avg_weights[i]
+                ),
+                confidence_lower=conf_lower[i],
+                confidence_upper=conf_upper[i]
+            )
+            for i, predicted_value in enumerate(predicted_values.tolist())
+        ]
+    
     def _prepare_features(
         self,
-        date_range: pd.DatetimeIndex,
+        n_predictions: int,
         province: str,
         city: str,
         species: str
-    ) -> pd.DataFrame:
+    ) -> np.ndarray:
         """
         Prepare features for harvest forecast model
         
@@ -245,51 +513,13 @@ class ModelPredictor:
         - Fingerlings: Number of fingerlings
         - SurvivalRate: Survival rate percentage
         - Month-based features for harvest forecasting
-        """
-        # Get the model to check what features it expects
-        model = self.models[species]
-        
-        # Try to get feature names from the model
-        feature_names = None
-        if hasattr(model, 'feature_names_in_'):
-            feature_names = model.feature_names_in_
-        elif hasattr(model, 'get_feature_names_out'):
-            try:
-                feature_names = model.get_feature_names_out()
-            except:
-                pass
         
-        # Create base dataframe with the number of predictions needed
-        n_predictions = len(date_range)
-        
-        # Default values for aquaculture features (these are typical averages)
-        # These can be adjusted based on historical data or user input
-        default_values = {
-            'Fingerlings': 5000,  # typical stocking density per pond
-            'SurvivalRate': 85.0,  # percentage - typical survival rate
-            'AvgWeight': 250.0  # grams - typical market weight for tilapia/bangus
-        }
-        
-        # Create dataframe with expected features in the correct order
-        if feature_names is not None:
-            # Create dataframe with features in the exact order the model expects
-            df = pd.DataFrame(index=range(n_predictions))
-            for feature in feature_names:
-                if feature in default_values:
-                    df[feature] = default_values[feature]
-                else:
-                    # For any other features, use 0 as default
-                    df[feature] = 0.0
-        else:
-            # Fallback: create dataframe with the known required features
-            # Order matters! Must match model's expected order: Fingerlings, SurvivalRate, AvgWeight
-            df = pd.DataFrame({
-                'Fingerlings': [default_values['Fingerlings']] * n_predictions,
-                'SurvivalRate': [default_values['SurvivalRate']] * n_predictions,
-                'AvgWeight': [default_values['AvgWeight']] * n_predictions
-            })
-        
-        return df
+        Column order and defaults come from the row built in _load_single_model.
+        Returns a float32 (n_predictions, n_features) array in that column order.
+        """
+        # Broadcast the cached default row to one row per prediction
+        row = self._default_row[species]
+        return np.broadcast_to(row, (n_predictions, row.size)).copy()
 
 
 # Global predictor instance
@@ -0,0 +1,61 @@
+"""
+Initial schema, as created by create_all before the storage changes
+
+Existing databases already have these tables: mark them with
+``alembic stamp 0001`` instead of running this revision.
+
+Revision ID: 0001
+Revises:
+Create Date: 2024-01-15 00:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'prediction_requests',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('request_id', sa.String(36), nullable=False),
+        sa.Column('species', sa.String(50), nullable=False),
+        sa.Column('province', sa.String(100), nullable=False),
+        sa.Column('city', sa.String(100), nullable=False),
+        sa.Column('date_from', sa.Date(), nullable=False),
+        sa.Column('date_to', sa.Date(), nullable=False),
+        sa.Column('created_at', sa.TIMESTAMP(), server_default=sa.func.now(), nullable=False),
+        sa.Column('ip_address', sa.String(45), nullable=True),
+        sa.Column('user_agent', sa.Text(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_prediction_requests_id', 'prediction_requests', ['id'])
+    op.create_index('ix_prediction_requests_request_id', 'prediction_requests', ['request_id'], unique=True)
+    op.create_index('ix_prediction_requests_species', 'prediction_requests', ['species'])
+    op.create_index('ix_prediction_requests_province', 'prediction_requests', ['province'])
+    op.create_index('ix_prediction_requests_city', 'prediction_requests', ['city'])
+    
+    op.create_table(
+        'predictions',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('request_id', sa.String(36), nullable=False),
+        sa.Column('prediction_date', sa.Date(), nullable=False),
+        sa.Column('predicted_harvest', sa.DECIMAL(10, 2), nullable=False),
+        sa.Column('confidence_lower', sa.DECIMAL(10, 2), nullable=True),
+        sa.Column('confidence_upper', sa.DECIMAL(10, 2), nullable=True),
+        sa.Column('created_at', sa.TIMESTAMP(), server_default=sa.func.now(), nullable=False),
+        sa.ForeignKeyConstraint(['request_id'], ['prediction_requests.request_id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_predictions_id', 'predictions', ['id'])
+    op.create_index('ix_predictions_request_id', 'predictions', ['request_id'])
+    op.create_index('ix_predictions_prediction_date', 'predictions', ['prediction_date'])
+
+
+def downgrade():
+    op.drop_table('predictions')
+    op.drop_table('prediction_requests')
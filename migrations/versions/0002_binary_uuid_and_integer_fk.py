@@ -0,0 +1,161 @@
+"""
+Store request UUIDs as BINARY(16), key predictions by integer id, composite indexes
+
+- prediction_requests.request_id: VARCHAR(36) -> BINARY(16), values backfilled
+- predictions.request_id: VARCHAR(36) FK to the UUID -> INT FK to prediction_requests.id
+- prediction_requests: single-column province/city indexes -> ix_pr_filter
+- predictions: ix_predictions_request_id -> ix_pred_req_date
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2024-02-01 00:00:00
+"""
+import uuid
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+# Rows per UPDATE executemany when converting UUIDs in Python
+_BATCH_SIZE = 1000
+
+
+def _drop_request_foreign_keys(batch_op, bind, offline_name: str):
+    """
+    Drop the predictions -> prediction_requests FK
+    
+    Names are reflected when connected; MySQL auto-named the original one
+    predictions_ibfk_1. Offline (--sql) the given name is assumed.
+    """
+    if context.is_offline_mode():
+        batch_op.drop_constraint(offline_name, type_='foreignkey')
+        return
+    
+    for fk in sa.inspect(bind).get_foreign_keys('predictions'):
+        if fk['referred_table'] == 'prediction_requests' and fk['name']:
+            batch_op.drop_constraint(fk['name'], type_='foreignkey')
+
+
+def _convert_request_ids(bind, to_binary: bool):
+    """Copy request_id into request_id_new, converting between UUID text and bytes"""
+    requests = sa.table(
+        'prediction_requests',
+        sa.column('id', sa.Integer),
+        sa.column('request_id'),
+        sa.column('request_id_new')
+    )
+    update = (
+        requests.update()
+        .where(requests.c.id == sa.bindparam('pk'))
+        .values(request_id_new=sa.bindparam('value'))
+    )
+    
+    rows = bind.execute(sa.select(requests.c.id, requests.c.request_id)).all()
+    for start in range(0, len(rows), _BATCH_SIZE):
+        params = [
+            {
+                'pk': pk,
+                'value': uuid.UUID(value).bytes if to_binary else str(uuid.UUID(bytes=bytes(value)))
+            }
+            for pk, value in rows[start:start + _BATCH_SIZE]
+        ]
+        bind.execute(update, params)
+
+
+def upgrade():
+    bind = op.get_bind()
+    
+    # predictions.request_id: UUID string FK -> integer FK on prediction_requests.id
+    with op.batch_alter_table('predictions') as batch_op:
+        _drop_request_foreign_keys(batch_op, bind, offline_name='predictions_ibfk_1')
+        batch_op.add_column(sa.Column('request_pk', sa.Integer(), nullable=True))
+    
+    op.execute(
+        "UPDATE predictions SET request_pk = ("
+        "SELECT prediction_requests.id FROM prediction_requests "
+        "WHERE prediction_requests.request_id = predictions.request_id)"
+    )
+    op.execute("DELETE FROM predictions WHERE request_pk IS NULL")
+    
+    with op.batch_alter_table('predictions') as batch_op:
+        batch_op.drop_index('ix_predictions_request_id')
+        batch_op.drop_column('request_id')
+        batch_op.alter_column('request_pk', new_column_name='request_id', existing_type=sa.Integer(), nullable=False)
+    
+    with op.batch_alter_table('predictions') as batch_op:
+        batch_op.create_index('ix_pred_req_date', ['request_id', 'prediction_date'])
+        batch_op.create_foreign_key('fk_predictions_request_id', 'prediction_requests', ['request_id'], ['id'])
+    
+    # prediction_requests.request_id: VARCHAR(36) -> BINARY(16)
+    with op.batch_alter_table('prediction_requests') as batch_op:
+        batch_op.add_column(sa.Column('request_id_new', sa.BINARY(16), nullable=True))
+    
+    if bind.dialect.name == 'mysql':
+        op.execute("UPDATE prediction_requests SET request_id_new = UNHEX(REPLACE(request_id, '-', ''))")
+    else:
+        _convert_request_ids(bind, to_binary=True)
+    
+    with op.batch_alter_table('prediction_requests') as batch_op:
+        batch_op.drop_index('ix_prediction_requests_request_id')
+        batch_op.drop_column('request_id')
+        batch_op.alter_column('request_id_new', new_column_name='request_id', existing_type=sa.BINARY(16), nullable=False)
+    
+    with op.batch_alter_table('prediction_requests') as batch_op:
+        batch_op.create_index('ix_prediction_requests_request_id', ['request_id'], unique=True)
+        
+        # Composite filter index replaces the single-column province/city ones
+        batch_op.drop_index('ix_prediction_requests_province')
+        batch_op.drop_index('ix_prediction_requests_city')
+        batch_op.create_index('ix_pr_filter', ['species', 'province', 'city', 'created_at'])
+
+
+def downgrade():
+    bind = op.get_bind()
+    
+    # prediction_requests.request_id: BINARY(16) -> VARCHAR(36)
+    with op.batch_alter_table('prediction_requests') as batch_op:
+        batch_op.drop_index('ix_pr_filter')
+        batch_op.create_index('ix_prediction_requests_province', ['province'])
+        batch_op.create_index('ix_prediction_requests_city', ['city'])
+        batch_op.add_column(sa.Column('request_id_new', sa.String(36), nullable=True))
+    
+    if bind.dialect.name == 'mysql':
+        op.execute(
+            "UPDATE prediction_requests SET request_id_new = LOWER("
+            "INSERT(INSERT(INSERT(INSERT(HEX(request_id), 9, 0, '-'), 14, 0, '-'), 19, 0, '-'), 24, 0, '-'))"
+        )
+    else:
+        _convert_request_ids(bind, to_binary=False)
+    
+    with op.batch_alter_table('predictions') as batch_op:
+        _drop_request_foreign_keys(batch_op, bind, offline_name='fk_predictions_request_id')
+        batch_op.add_column(sa.Column('request_uuid', sa.String(36), nullable=True))
+    
+    op.execute(
+        "UPDATE predictions SET request_uuid = ("
+        "SELECT prediction_requests.request_id_new FROM prediction_requests "
+        "WHERE prediction_requests.id = predictions.request_id)"
+    )
+    
+    with op.batch_alter_table('prediction_requests') as batch_op:
+        batch_op.drop_index('ix_prediction_requests_request_id')
+        batch_op.drop_column('request_id')
+        batch_op.alter_column('request_id_new', new_column_name='request_id', existing_type=sa.String(36), nullable=False)
+    
+    with op.batch_alter_table('prediction_requests') as batch_op:
+        batch_op.create_index('ix_prediction_requests_request_id', ['request_id'], unique=True)
+    
+    # predictions.request_id: integer FK -> UUID string FK
+    with op.batch_alter_table('predictions') as batch_op:
+        batch_op.drop_index('ix_pred_req_date')
+        batch_op.drop_column('request_id')
+        batch_op.alter_column('request_uuid', new_column_name='request_id', existing_type=sa.String(36), nullable=False)
+    
+    with op.batch_alter_table('predictions') as batch_op:
+        batch_op.create_index('ix_predictions_request_id', ['request_id'])
+        batch_op.create_foreign_key('fk_predictions_request_id', 'prediction_requests', ['request_id'], ['request_id'])
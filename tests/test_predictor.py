@@ -0,0 +1,60 @@
+"""
+Tests for the direct linear-model evaluator and forecast range checks in app.predictor
+"""
+from datetime import date
+
+import numpy as np
+import pytest
+from sklearn.linear_model import PoissonRegressor, GammaRegressor, TweedieRegressor
+
+from app.predictor import IDENTITY_LINK_MODELS, ModelPredictor, _linear_predict
+
+
+@pytest.fixture
+def training_data():
+    """Small positive regression problem shaped like the harvest features"""
+    rng = np.random.default_rng(0)
+    X = rng.uniform(0.5, 2.0, size=(60, 3))
+    y = X @ np.array([0.8, 0.3, 0.5]) + 1.0 + rng.normal(0, 0.05, size=60)
+    return X, y
+
+
+@pytest.mark.parametrize("model_cls", IDENTITY_LINK_MODELS, ids=lambda cls: cls.__name__)
+def test_direct_path_matches_predict(model_cls, training_data):
+    """The direct evaluator gives the same forecasts as the model's own predict"""
+    X, y = training_data
+    model = model_cls().fit(X, y)
+    
+    linear_predict = _linear_predict(model)
+    
+    assert linear_predict is not None
+    features = X[:10].astype(np.float32)
+    np.testing.assert_allclose(linear_predict(features), model.predict(features), rtol=1e-6)
+
+
+@pytest.mark.parametrize("model_cls", [PoissonRegressor, GammaRegressor, TweedieRegressor])
+def test_glm_regressors_keep_their_own_predict(model_cls, training_data):
+    """GLMs apply an inverse link in predict, so they never get the direct path"""
+    X, y = training_data
+    model = model_cls().fit(X, y)
+    
+    assert _linear_predict(model) is None
+
+
+def test_subclass_keeps_its_own_predict(training_data):
+    """A subclass may override predict, so only exact types get the direct path"""
+    X, y = training_data
+    model_cls = IDENTITY_LINK_MODELS[0]
+    subclass = type("CustomModel", (model_cls,), {})
+    
+    assert _linear_predict(subclass().fit(X, y)) is None
+
+
+def test_range_without_month_start_is_rejected():
+    """A range with no first-of-month is a 400 for any model, not an empty forecast"""
+    predictor = ModelPredictor()
+    
+    with pytest.raises(ValueError, match="first day of at least one month"):
+        predictor._forecast_months(date(2024, 1, 2), date(2024, 1, 20))
+    
+    assert predictor._forecast_months(date(2024, 1, 2), date(2024, 2, 1)) == [date(2024, 2, 1)]